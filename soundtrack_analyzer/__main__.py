@@ -6,6 +6,7 @@ A 'combo' script which:
     3. Summarizes the latest month
 """
 
+import os
 import subprocess
 from argparse import ArgumentParser, Namespace, RawDescriptionHelpFormatter
 from pathlib import Path
@@ -37,18 +38,15 @@ def get_latest_month(directory: str) -> str:
             return -1
         return result
 
-    directory = Path(directory)
-    result = max(
-        (folder for folder in directory.glob("*") if folder.is_dir()),
-        key=month,
-    )
+    def subfolders(path: Path) -> list[Path]:
+        with os.scandir(path) as entries:
+            return [Path(entry.path) for entry in entries if entry.is_dir()]
+
+    result = max(subfolders(Path(directory)), key=month)
 
     if month(result) > 12:
         # year directory
-        result = max(
-            (folder for folder in result.glob("*") if folder.is_dir()),
-            key=month,
-        )
+        result = max(subfolders(result), key=month)
 
     return str(result)
 
@@ -7,71 +7,102 @@ summarizing how much of the sound samples are considered high.
 Produces both raw value and plot summary.
 """
 
-import subprocess
-import wave
+import os
 from argparse import ArgumentParser, Namespace, RawDescriptionHelpFormatter
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime
-from itertools import repeat
+from itertools import islice
 from pathlib import Path
-from tempfile import TemporaryDirectory
 from typing import NamedTuple, Optional
 
+import av
+import matplotlib
 import matplotlib.pyplot as plt
 import numpy as np
 from matplotlib.dates import DateFormatter
+from numba import from_dtype, int64, njit, void
+from numba.types import Array
 from python_utils.timer import format_delta, timer
-from tqdm.contrib.concurrent import process_map
+from tqdm.auto import tqdm
 
-from .utils import extract_timestamp, to_datetime, write_csv
+from .utils import extract_timestamp, to_datetime_arr, write_csv
 
 
-def read_sound_file(
-    file: str, samples: int | float = -1
-) -> tuple[np.ndarray, np.ndarray]:
-    """Load .wav file"""
+SAMPLE_RATE = 8_000  # TAPO cameras record sound at 8kHz
 
-    signal_wave = wave.open(file, "r")
-    if signal_wave.getnchannels() == 2:
-        raise ValueError("Only mono files supported.")
 
-    if isinstance(samples, float):
-        if samples.is_integer():
-            samples = int(samples)
-        else:
-            samples = int(signal_wave.getnframes() * samples)
+def decode_to_memory(
+    input_file: str, rate: Optional[int] = None
+) -> tuple[np.ndarray, int]:
+    """
+    Decode the soundtrack of .mp4 (or .wav) file straight into memory
+    as mono 16-bit PCM.
+
+    Parameters
+    ----------
+    rate : Optional[int]
+        Resample the signal to given rate. By default the file's own
+        sample rate is kept (resampling changes the peak amplitudes).
+    """
+    chunks = []
+
+    with av.open(str(input_file)) as container:
+        stream = container.streams.audio[0]
+        rate = rate or stream.rate
+        resampler = av.AudioResampler(format="s16", layout="mono", rate=rate)
+
+        for frame in container.decode(stream):
+            chunks += [item.to_ndarray() for item in resampler.resample(frame)]
+        chunks += [item.to_ndarray() for item in resampler.resample(None)]
 
-    signal = np.frombuffer(signal_wave.readframes(samples), dtype=np.int16)
-    signal = np.abs(signal)
+    if not chunks:
+        return np.empty(0, dtype=np.int16), rate
+
+    signal = np.concatenate(chunks, axis=1)[0]
+
+    return np.abs(signal), rate
+
+
+def make_time(n_samples: int, rate: int, stride: int = 1) -> np.ndarray:
+    """
+    Generate timestamps (in seconds) of every 'stride'-th sample
+    """
+    return np.arange(0, n_samples, stride) / rate
 
-    frame_rate = signal_wave.getframerate()
-    time = np.linspace(0, len(signal) / frame_rate, num=len(signal))
 
-    return time, signal
+_FIGURE = None  # summary plot figure, reused across files (see 'plot')
 
 
-def extract_sound(input_file: str, output_file: str, verbose: bool = False):
+def _summary_figure() -> plt.Figure:
     """
-    Extract soundtrack from .mp4 file
+    Get the cleared summary plot figure - created once per process,
+    reusing it saves the figure and axes setup for every file.
     """
-    if verbose:
-        kwargs = {}
+    global _FIGURE
+
+    if _FIGURE is None or not plt.fignum_exists(_FIGURE.number):
+        _FIGURE = plt.subplots(2, figsize=(15, 6))[0]
+        _FIGURE.supxlabel("Time")
+        _FIGURE.supylabel("Volume")
     else:
-        kwargs = {"stdout": subprocess.DEVNULL, "stderr": subprocess.STDOUT}
+        for axis in _FIGURE.axes:
+            axis.cla()
 
-    subprocess.run(
-        ["ffmpeg", "-i", str(input_file), str(output_file)],
-        check=True,
-        **kwargs,
-    )
+    return _FIGURE
 
 
 def plot(
-    time: list,
-    signal: list,
+    signal: np.ndarray,
+    rate: int,
     cutoff: int,
     message: str,
     undersample: Optional[int] = None,
-):
+) -> plt.Figure:
     """
     Create summary plot
 
@@ -82,81 +113,141 @@ def plot(
 
     """
 
-    formatter = DateFormatter("%H:%M:%S")
-    fig, (ax1, ax2) = plt.subplots(2, figsize=(15, 6))
-    plt.suptitle(message, fontweight="bold", y=0.99)
+    fig = _summary_figure()
+    ax1, ax2 = fig.axes
+    fig.suptitle(message, fontweight="bold", y=0.99)
 
-    if undersample:
-        signal = signal[::undersample]
-        time = time[::undersample]
+    stride = undersample or 1
+    time = to_datetime_arr(make_time(len(signal), rate, stride))
+    signal = signal[::stride]
 
     half = len(signal) // 2
-    time = to_datetime(time)
 
     ax1.plot(time[:half], signal[:half])
     ax1.axhline(y=cutoff, color="r", linestyle="--")
-    ax1.xaxis.set_major_formatter(formatter)
+    ax1.xaxis.set_major_formatter(DateFormatter("%H:%M:%S"))
     ax1.set_yticks([])
 
     ax2.plot(time[half:], signal[half:])
     ax2.axhline(y=cutoff, color="r", linestyle="--")
-    ax2.xaxis.set_major_formatter(formatter)
+    ax2.xaxis.set_major_formatter(DateFormatter("%H:%M:%S"))
     ax2.set_yticks([])
 
-    fig.supxlabel("Time")
-    fig.supylabel("Volume")
+    fig.tight_layout()
 
-    plt.tight_layout()
+    return fig
 
 
-def patch_signal(signal: list, cutoff: int, max_gap: int = 0) -> np.ndarray:
+# Kernels are compiled eagerly for the given signatures and cached on disk,
+# so worker processes load them instead of compiling on the first call.
+# int16 - decoded signals, the rest - plain arrays (see '_kernel_input').
+_KERNEL_DTYPES = [
+    np.dtype(dtype) for dtype in ("int16", "int32", "int64", "float64")
+]
+
+
+def _kernel_input(signal: list) -> np.ndarray:
+    """Convert signal to one of the dtypes the kernels are compiled for"""
+    signal = np.asarray(signal)
+    if signal.dtype in _KERNEL_DTYPES:
+        return signal
+
+    if np.issubdtype(signal.dtype, np.integer):
+        return signal.astype(np.int64)
+
+    return signal.astype(np.float64)
+
+
+@njit(
+    [void(from_dtype(dtype)[:], int64, int64) for dtype in _KERNEL_DTYPES],
+    cache=True,
+)
+def _patch_signal(signal: np.ndarray, cutoff: int, max_gap: int):
+    """Single pass, in-place kernel of 'patch_signal'"""
+    run_start = 0  # first sample of the current run below cutoff
+
+    for i in range(len(signal) + 1):
+        if i < len(signal) and signal[i] <= cutoff:
+            continue
+
+        if 0 < i - run_start <= max_gap:
+            for j in range(run_start, i):
+                signal[j] = cutoff + 1
+
+        run_start = i + 1
+
+
+@njit(
+    [
+        # read-only signatures - accept both writable and read-only arrays
+        int64(Array(from_dtype(dtype), 1, "A", readonly=True), int64, int64)
+        for dtype in _KERNEL_DTYPES
+    ],
+    cache=True,
+)
+def _count_patched(signal: np.ndarray, cutoff: int, max_gap: int) -> int:
     """
-    Patch given signal: if at most 'max_gap' values between samples are below
-    cutoff value - fill them with 'cutoff + 1'
+    Count samples above cutoff as if the signal was patched
+    (the signal itself is left untouched).
     """
+    count = 0
+    run_start = 0  # first sample of the current run below cutoff
 
-    if signal[0] > cutoff:
-        mask = signal > cutoff
-        below = False
-    else:
-        mask = signal <= cutoff
-        below = True
+    for i in range(len(signal) + 1):
+        if i < len(signal) and signal[i] <= cutoff:
+            continue
 
-    index = 0
-    gaps = []
+        if 0 < i - run_start <= max_gap:
+            count += i - run_start
 
-    result = np.diff(
-        np.where(np.concatenate(([mask[0]], mask[:-1] != mask[1:], [True])))[0]
-    )
-    for item in result:
-        if below is True and item <= max_gap:
-            gaps += list(range(index, index + item))
+        if i < len(signal):
+            count += 1
+        run_start = i + 1
+
+    return count
 
-        index += item
-        below = not below
 
-    signal[gaps] = cutoff + 1
+def patch_signal(signal: list, cutoff: int, max_gap: int = 0) -> np.ndarray:
+    """
+    Patch given signal: if at most 'max_gap' values between samples are below
+    cutoff value - fill them with 'cutoff + 1'
+
+    The signal is patched in place, unless it has to be converted first
+    (unsupported dtype or read-only array) - use the returned signal.
+    """
+
+    signal = np.require(_kernel_input(signal), requirements="W")
+    _patch_signal(signal, int(cutoff), int(max_gap))
 
     return signal
 
 
-def get_bark_fraction(signal: list, cutoff: int, max_gap: float = 0) -> float:
+def get_bark_fraction(
+    signal: list, cutoff: int, max_gap: float = 0, rate: int = SAMPLE_RATE
+) -> float:
     """
-    Patch the signal and calculate bark fraction.
+    Calculate bark fraction of the patched signal (without patching it).
 
     Parameters
     ----------
     max_gap : float
         Maximal distance between samples required to patch the signal.
         Should be provided in SECONDS, not number of samples.
+
+    rate : int
+        Sample rate of the signal, used to convert 'max_gap' to samples.
     """
 
-    if max_gap <= 0:
-        return np.count_nonzero(signal > cutoff) / len(signal)
+    # convert seconds gap to n-samples gap (non-positive gap patches nothing)
+    max_gap = int(max(max_gap, 0) * rate)
+
+    if len(signal) == 0:  # e.g. a truncated recording
+        return 0.0
 
-    max_gap /= 0.000125  # convert seconds gap to n-samples gap
-    signal = patch_signal(signal.copy(), cutoff, max_gap)
-    return np.count_nonzero(signal > cutoff) / len(signal)
+    # the kernel reads the int16 signal directly - no temporary arrays
+    signal = _kernel_input(signal)
+    count = _count_patched(signal, int(cutoff), max_gap)
+    return count / len(signal)
 
 
 class AnalysisResult(NamedTuple):
@@ -165,38 +256,22 @@ class AnalysisResult(NamedTuple):
     bark_time: float
 
 
-def analyze_file(
+def analyze_signal(
     input_file: str,
+    signal: np.ndarray,
+    rate: int,
     cutoff: int = 5_000,
     max_gap: float = 0,
     undersample: Optional[int] = None,
     output_file: Optional[str] = None,
 ) -> AnalysisResult:
     """
-    Perform full analysis of file (.mp4 or .wav).
-
-    Extracts signal, patches it, produces AnalysisResult and a summary plot.
+    Perform analysis of an already loaded signal of 'input_file'.
 
-    Parameters
-    ----------
-    output_file : Optional[str]
-        Provide a path to save summary plot to a file. Provide 'auto' for
-        automatic filename generation.
-
-    undersample : Optional[int]
-        Undersample the signal to reduce computational complexity.
-        Parameter applies only to plotting.
+    See 'analyze_file' for parameters description.
     """
-    if input_file.endswith(".wav"):
-        time, signal = read_sound_file(input_file)
-    else:
-        with TemporaryDirectory() as tempdir:
-            tempfile = Path(tempdir) / "sound.wav"
-            extract_sound(input_file, str(tempfile))
-            time, signal = read_sound_file(str(tempfile))
-
-    total_time = time[-1]
-    bark_fraction = get_bark_fraction(signal, cutoff, max_gap)
+    total_time = len(signal) / rate
+    bark_fraction = get_bark_fraction(signal, cutoff, max_gap, rate)
     bark_time = total_time * bark_fraction
 
     message = (
@@ -205,9 +280,9 @@ def analyze_file(
         f" ({np.round(bark_fraction * 100, 2)}%)"
     )
 
-    plot(
-        time=time,
+    fig = plot(
         signal=signal,
+        rate=rate,
         cutoff=cutoff,
         message=message,
         undersample=undersample,
@@ -217,11 +292,111 @@ def analyze_file(
         if output_file == "auto":
             output_file = Path(input_file).with_suffix(".png")
 
-        plt.savefig(output_file)
+        fig.savefig(output_file)
 
     return AnalysisResult(extract_timestamp(input_file), total_time, bark_time)
 
 
+def analyze_file(
+    input_file: str,
+    cutoff: int = 5_000,
+    max_gap: float = 0,
+    undersample: Optional[int] = None,
+    output_file: Optional[str] = None,
+) -> AnalysisResult:
+    """
+    Perform full analysis of file (.mp4 or .wav).
+
+    Extracts signal, patches it, produces AnalysisResult and a summary plot.
+
+    Parameters
+    ----------
+    output_file : Optional[str]
+        Provide a path to save summary plot to a file. Provide 'auto' for
+        automatic filename generation.
+
+    undersample : Optional[int]
+        Undersample the signal to reduce computational complexity.
+        Parameter applies only to plotting.
+    """
+    signal, rate = decode_to_memory(input_file)
+
+    return analyze_signal(
+        input_file,
+        signal,
+        rate,
+        cutoff=cutoff,
+        max_gap=max_gap,
+        undersample=undersample,
+        output_file=output_file,
+    )
+
+
+def _init_worker():
+    # workers only save the plots - skip interactive backend setup
+    matplotlib.use("Agg")
+
+
+def analyze_files(
+    input_files: list[str],
+    max_workers: Optional[int] = None,
+    **kwargs,
+) -> list[AnalysisResult]:
+    """
+    Analyze multiple files concurrently.
+
+    Decoding (I/O bound) runs in a thread pool and feeds the analysis
+    (CPU bound) running in a process pool, so both stages overlap.
+    At most 2 * 'max_workers' files are in flight at once to cap the memory
+    taken by decoded signals.
+
+    Parameters
+    ----------
+    kwargs
+        Passed to 'analyze_signal'.
+    """
+    max_workers = max_workers or os.cpu_count()
+    queued = iter(input_files)
+    results = {}
+
+    with (
+        ThreadPoolExecutor(max_workers) as decoders,
+        ProcessPoolExecutor(
+            max_workers, initializer=_init_worker
+        ) as analyzers,
+        tqdm(total=len(input_files), desc="Analyzing") as progress,
+    ):
+        decoding = {
+            decoders.submit(decode_to_memory, file): file
+            for file in islice(queued, 2 * max_workers)
+        }
+        analyzing = {}
+
+        while decoding or analyzing:
+            done, _ = wait(
+                [*decoding, *analyzing], return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                if future in decoding:
+                    file = decoding.pop(future)
+                    signal, rate = future.result()
+                    analysis = analyzers.submit(
+                        analyze_signal, file, signal, rate, **kwargs
+                    )
+                    analyzing[analysis] = file
+                    continue
+
+                file = analyzing.pop(future)
+                results[file] = future.result()
+                progress.update()
+
+                for next_file in islice(queued, 1):
+                    future = decoders.submit(decode_to_memory, next_file)
+                    decoding[future] = next_file
+
+    return [results[file] for file in input_files]
+
+
 def get_filelist(input_path: Path, rewrite: bool = False) -> list[str]:
     """
     Generate file list for directory input.
@@ -229,15 +404,18 @@ def get_filelist(input_path: Path, rewrite: bool = False) -> list[str]:
     Skip processed files unless 'rewrite' argument is set.
     """
 
+    with os.scandir(input_path) as entries:
+        names = [entry.name for entry in entries if entry.is_file()]
+
+    videos = [name for name in names if name.endswith(".mp4")]
     if rewrite:
-        return [str(file) for file in input_path.glob("*.mp4")]
+        return [str(input_path / name) for name in videos]
 
-    result = []
-    for file in input_path.glob("*.mp4"):
-        if not file.with_suffix(".png").is_file():
-            result.append(str(file))
+    plots = {name[:-4] for name in names if name.endswith(".png")}
 
-    return result
+    return [
+        str(input_path / name) for name in videos if name[:-4] not in plots
+    ]
 
 
 def parse_args() -> Namespace:
@@ -288,7 +466,7 @@ def parse_args() -> Namespace:
     parser.add_argument(
         "--n-jobs",
         type=int,
-        help="Number of processes for concurrent format conversion",
+        help="Number of concurrent decoding threads and analysis processes",
     )
 
     return parser.parse_args()
@@ -314,15 +492,13 @@ def main(args: Namespace):
     elif input_path.is_dir():
         input_files = get_filelist(input_path, args.rewrite)
 
-        results = process_map(
-            analyze_file,
+        results = analyze_files(
             input_files,
-            repeat(args.cutoff),
-            repeat(args.max_gap),
-            repeat(args.undersample),
-            repeat("auto"),
             max_workers=args.n_jobs,
-            desc="Analyzing",
+            cutoff=args.cutoff,
+            max_gap=args.max_gap,
+            undersample=args.undersample,
+            output_file="auto",
         )
         summary_file = input_path / "summary.csv"
         write_csv(results, summary_file, overwrite=args.rewrite)
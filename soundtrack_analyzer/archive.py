@@ -1,34 +1,121 @@
+import os
 import shutil
+import subprocess
+import tarfile
 from argparse import ArgumentParser, Namespace, RawDescriptionHelpFormatter
+from itertools import repeat
 from pathlib import Path
-from tempfile import TemporaryDirectory
 
-from python_utils.archives import create_archive
 from tqdm.contrib.concurrent import thread_map
 
 
-def archive_dir(path: Path):
+def _gnu_tar() -> bool:
+    """Check if 'tar' is GNU tar (bsdtar on macOS/Windows lacks --transform)"""
+    if shutil.which("tar") is None:
+        return False
+
+    version = subprocess.run(
+        ["tar", "--version"], capture_output=True, text=True, check=False
+    )
+    return "GNU tar" in version.stdout
+
+
+def _tar_compress(
+    path: Path, files: list[Path], archive: Path, threads: int
+) -> None:
     """
-    Moves all .mp4 files in path to a 'recordings.tgz' archive.
+    Compress with GNU tar, multi-threaded 'pigz' when available
+    or tar's built-in gzip otherwise.
     """
-    files = list(path.glob("*.mp4"))
-    if not files:
+    command = [
+        "tar",
+        "-c",
+        "-C",
+        str(path),
+        "--transform=s,^,recordings/,",
+        "--null",
+        "--files-from=-",
+    ]
+    names = b"\0".join(os.fsencode(file.name) for file in files)
+
+    if shutil.which("pigz") is None:
+        subprocess.run(
+            [*command, "-z", "-f", str(archive)], input=names, check=True
+        )
         return
 
-    with TemporaryDirectory() as temp_dir:
-        temp_dir = Path(temp_dir) / "recordings"
-        temp_dir.mkdir()
-
+    with archive.open("wb") as handle:
+        tar = subprocess.Popen(
+            [*command, "-f", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+        )
+        pigz = subprocess.Popen(
+            ["pigz", "-p", str(threads)], stdin=tar.stdout, stdout=handle
+        )
+        tar.stdout.close()
+        tar.stdin.write(names)
+        tar.stdin.close()
+
+        for process in (tar, pigz):
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(
+                    process.returncode, process.args
+                )
+
+
+def _tarfile_compress(files: list[Path], archive: Path) -> None:
+    """Portable (single-threaded) fallback"""
+    with tarfile.open(archive, "w:gz") as handle:
         for file in files:
-            shutil.copy(file, temp_dir / file.name)
-            file.unlink()
+            handle.add(file, arcname=f"recordings/{file.name}")
+
 
-        create_archive(str(temp_dir))
+def compress(path: Path, files: list[Path], threads: int = 1) -> Path:
+    """
+    Compress 'files' from 'path' to 'path/recordings.tgz' (stored under
+    'recordings/'). The files are read in place - no intermediate copy.
 
-        archive = temp_dir.parent / "recordings.tgz"
-        assert archive.is_file()
+    Uses GNU tar (with 'pigz' when available), falls back to 'tarfile'
+    otherwise. The archive is written under a temporary name and renamed
+    only once complete - a failed run leaves an existing archive intact.
+    """
+    archive = path / "recordings.tgz"
+    partial = path / "recordings.tgz.part"
 
-        shutil.copy(archive, path / archive.name)
+    try:
+        if _gnu_tar():
+            _tar_compress(path, files, partial, threads)
+        else:
+            _tarfile_compress(files, partial)
+    except BaseException:
+        partial.unlink(missing_ok=True)
+        raise
+
+    partial.replace(archive)
+
+    return archive
+
+
+def archive_dir(path: Path, threads: int = 1):
+    """
+    Moves all .mp4 files in path to a 'recordings.tgz' archive.
+
+    Parameters
+    ----------
+    threads : int = 1
+        Number of compression threads.
+    """
+    files = list(path.glob("*.mp4"))
+    if not files:
+        return
+
+    archive = compress(path, files, threads)
+    assert archive.is_file()
+
+    # remove the recordings only once the archive is complete
+    for file in files:
+        file.unlink()
 
 
 def get_subfolders(path: Path, archive_all: bool = False) -> list[Path]:
@@ -45,10 +132,11 @@ def get_subfolders(path: Path, archive_all: bool = False) -> list[Path]:
     def sorting_key(file: Path) -> int:
         return int(file.name)
 
-    subfolders = sorted(
-        (folder for folder in path.glob("*") if folder.is_dir()),
-        key=sorting_key,
-    )
+    with os.scandir(path) as entries:
+        subfolders = sorted(
+            (Path(entry.path) for entry in entries if entry.is_dir()),
+            key=sorting_key,
+        )
 
     if not archive_all:
         del subfolders[-1]
@@ -79,10 +167,12 @@ def main(args: Namespace):
         is_month_dir = any(path.glob("*.mp4"))
 
         if is_month_dir:
-            archive_dir(path)
+            archive_dir(path, os.cpu_count())
         else:  # year input
             subfolders = get_subfolders(path, args.archive_all)
-            thread_map(archive_dir, subfolders)
+            # folders are archived concurrently - share the cores among them
+            threads = max(1, os.cpu_count() // max(1, len(subfolders)))
+            thread_map(archive_dir, subfolders, repeat(threads))
     else:
         raise ValueError(f"Path: {path} is not a valid target.")
 
@@ -6,8 +6,10 @@ All files that are already in the destination are skipped
 WARNING: Script written for specific filenames format (TAPO cameras recordings)
 """
 
+import os
 import shutil
 from argparse import ArgumentParser, Namespace, RawDescriptionHelpFormatter
+from collections import defaultdict
 from datetime import datetime
 from itertools import repeat
 from pathlib import Path
@@ -15,14 +17,19 @@ from pathlib import Path
 from tqdm.auto import tqdm
 from tqdm.contrib.concurrent import thread_map
 
+from .utils import extract_timestamp
+
 
 def copy_file(source_file: Path, destination: Path):
-    shutil.copy(source_file, destination / source_file.name)
+    """
+    Copy file contents only (no permission bits) - lets 'shutil' use
+    the platform fast-copy (e.g. sendfile on Linux)
+    """
+    shutil.copyfile(source_file, destination / source_file.name)
 
 
 def process_file(file: Path, destination_root: Path):
-    filename = "_".join(file.name.split("_")[:2])
-    date = datetime.strptime(filename, "%Y%m%d_%H%M%S")
+    date = extract_timestamp(file)
 
     destination_dir = destination_root / str(date.year) / str(date.month)
     if not destination_dir.is_dir():
@@ -31,18 +38,17 @@ def process_file(file: Path, destination_root: Path):
     copy_file(file, destination_dir)
 
 
-def exists(
-    source: Path, destination: Path, max_size_diff: float = 0.05
+def size_matches(
+    source: Path,
+    destination: Path,
+    dest_size: int,
+    max_size_diff: float = 0.05,
 ) -> bool:
     """
-    Check if target file exists - both name and size must match.
+    Check if the sizes of source and already copied file match.
     (size difference has a flexibility parameter.)
     """
-    if not destination.is_file():
-        return False
-
     source_size = source.stat().st_size
-    dest_size = destination.stat().st_size
 
     # check the difference in size
     diff = abs(dest_size - source_size)
@@ -53,25 +59,68 @@ def exists(
     return True
 
 
+def index_destination(destinations: list[Path]) -> dict[Path, int]:
+    """
+    Map the existing destinations to their sizes.
+
+    Each destination folder is scanned once and only the wanted files are
+    stat-ed, instead of checking every destination separately.
+    """
+    wanted = defaultdict(set)
+    for destination in destinations:
+        wanted[destination.parent].add(destination.name)
+
+    result = {}
+    for folder, names in wanted.items():
+        if not folder.is_dir():
+            continue
+
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name in names and entry.is_file():
+                    result[folder / entry.name] = entry.stat().st_size
+
+    return result
+
+
 def get_filelist(
-    source_dir: Path, destination_root: Path, cutoff_date: datetime
+    source_dir: Path,
+    destination_root: Path,
+    cutoff_date: datetime,
+    max_size_diff: float = 0.05,
 ) -> list[Path]:
-    result = []
-
-    for file in source_dir.glob("*.mp4"):
+    """
+    List source files missing in the destination - both name and size
+    must match for a file to be skipped.
+    """
+    with os.scandir(source_dir) as entries:
+        files = [
+            Path(entry.path)
+            for entry in entries
+            if entry.name.endswith(".mp4")
+        ]
+
+    destinations = {}
+    for file in files:
         if "xx" in str(file):
             continue
 
-        filename = "_".join(file.name.split("_")[:2])
-        date = datetime.strptime(filename, "%Y%m%d_%H%M%S")
+        date = extract_timestamp(file)
 
         if date < cutoff_date:
             continue
 
         destination_dir = destination_root / str(date.year) / str(date.month)
-        destination = destination_dir / file.name
+        destinations[file] = destination_dir / file.name
 
-        if not exists(file, destination):
+    copied = index_destination(list(destinations.values()))
+
+    result = []
+    for file, destination in destinations.items():
+        dest_size = copied.get(destination)
+        if dest_size is None or not size_matches(
+            file, destination, dest_size, max_size_diff
+        ):
             result.append(file)
 
     return result
@@ -6,11 +6,14 @@ from argparse import ArgumentParser, Namespace, RawDescriptionHelpFormatter
 from pathlib import Path
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as ds
 from matplotlib import pyplot as plt
 from matplotlib.dates import DateFormatter
 from python_utils.timer import format_delta
 
-from .utils import to_datetime
+from .utils import to_datetime_arr
 
 
 def plot_summary(df: pd.DataFrame, output_dir: Path, title: str):
@@ -28,8 +31,8 @@ def plot_summary(df: pd.DataFrame, output_dir: Path, title: str):
         groupped.bark_time / groupped.total_time
     ) * 100
 
-    groupped.total_time = groupped.total_time.apply(to_datetime)
-    groupped.bark_time = groupped.bark_time.apply(to_datetime)
+    groupped.total_time = to_datetime_arr(groupped.total_time.values)
+    groupped.bark_time = to_datetime_arr(groupped.bark_time.values)
 
     msg = (
         f"{title}\n"
@@ -97,26 +100,50 @@ def plot_summary(df: pd.DataFrame, output_dir: Path, title: str):
     plt.savefig(output_dir / "summary.png")
 
 
+TIMESTAMP_UNIT = "us"  # same timestamp dtype for monthly and yearly summaries
+TIMESTAMP_DTYPE = f"datetime64[{TIMESTAMP_UNIT}]"
+
+
+def read_summaries(files: list[Path]) -> pd.DataFrame:
+    """
+    Read multiple summary files at once (in parallel, with pyarrow)
+    """
+    csv_format = ds.CsvFileFormat(
+        convert_options=pa_csv.ConvertOptions(
+            column_types={
+                "timestamp": pa.timestamp(TIMESTAMP_UNIT),
+                "total_time": pa.float64(),
+                "bark_time": pa.float64(),
+            }
+        )
+    )
+    dataset = ds.dataset([str(file) for file in files], format=csv_format)
+
+    return dataset.to_table().to_pandas()
+
+
 def get_summary(input_path: Path):
-    parse_dates = {"parse_dates": ["timestamp"]}
+    read_options = {"engine": "pyarrow", "parse_dates": ["timestamp"]}
+    timestamp_dtype = {"timestamp": TIMESTAMP_DTYPE}
 
     if input_path.is_file():  # monthly
         title = calendar.month_name[int(input_path.parent.name)]
-        df = pd.read_csv(input_path, **parse_dates)
+        df = pd.read_csv(input_path, **read_options).astype(timestamp_dtype)
         plot_summary(df, output_dir=input_path.parent, title=title)
     elif input_path.is_dir():
         if (input_path / "summary.csv").is_file():  # monthly
-            df = pd.read_csv(input_path / "summary.csv", **parse_dates)
+            df = pd.read_csv(input_path / "summary.csv", **read_options)
+            df = df.astype(timestamp_dtype)
             title = calendar.month_name[int(input_path.name)]
             plot_summary(df, output_dir=input_path, title=title)
 
         else:  # yearly
-            frames = [
-                pd.read_csv(file, **parse_dates)
+            files = [
+                file
                 for file in input_path.rglob("*.csv")
                 if file.name == "summary.csv"
             ]
-            df = pd.concat(frames)
+            df = read_summaries(files)
             plot_summary(df, output_dir=input_path, title=str(input_path.name))
 
 
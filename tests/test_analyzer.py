@@ -1,7 +1,17 @@
+import wave
+from pathlib import Path
+
 import numpy as np
 import pytest
 
-from soundtrack_analyzer.analyze import patch_signal
+from soundtrack_analyzer.analyze import (
+    analyze_file,
+    analyze_files,
+    decode_to_memory,
+    get_bark_fraction,
+    get_filelist,
+    patch_signal,
+)
 
 
 @pytest.mark.parametrize(
@@ -36,3 +46,113 @@ def test_signal_patching(signal: list, patched: list):
     result = patch_signal(signal, cutoff, max_gap)
 
     assert np.allclose(patched, result)
+
+
+@pytest.mark.parametrize("dtype", [np.int16, np.int32, np.uint16, np.float64])
+@pytest.mark.parametrize("readonly", [False, True])
+def test_signal_dtypes(dtype, readonly: bool):
+    signal = np.array([0, 200, 200, 0, 0, 0, 200, 0], dtype=dtype)
+    signal.flags.writeable = not readonly
+
+    fraction = get_bark_fraction(signal, cutoff=100, max_gap=2, rate=1)
+    result = patch_signal(signal, cutoff=100, max_gap=2)
+
+    assert np.isclose(fraction, 5 / 8)
+    assert np.allclose(result, [101, 200, 200, 0, 0, 0, 200, 101])
+
+
+@pytest.mark.parametrize(
+    "max_gap, fraction",
+    [
+        (0, 6 / 14),
+        (-1, 6 / 14),
+        (2, 11 / 14),
+        (3, 1.0),
+    ],
+)
+def test_bark_fraction(max_gap: float, fraction: float):
+    signal = np.array(
+        [0, 200, 200, 0, 0, 0, 200, 0, 200, 0, 0, 200, 200, 0], dtype=np.int16
+    )
+    original = signal.copy()
+
+    result = get_bark_fraction(signal, cutoff=100, max_gap=max_gap, rate=1)
+
+    assert np.isclose(result, fraction)
+    assert np.array_equal(signal, original)  # signal is left unpatched
+
+
+def test_filelist_skip_processed(tmp_path):
+    for name in ("file1", "file2", "file3"):
+        (tmp_path / f"{name}.mp4").touch()
+    (tmp_path / "file2.png").touch()
+    (tmp_path / "summary.png").touch()
+
+    result = get_filelist(tmp_path)
+
+    assert sorted(result) == [
+        str(tmp_path / "file1.mp4"),
+        str(tmp_path / "file3.mp4"),
+    ]
+    assert len(get_filelist(tmp_path, rewrite=True)) == 3
+
+
+def write_wav(file, signal: np.ndarray, rate: int):
+    with wave.open(str(file), "w") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(rate)
+        handle.writeframes(signal.astype(np.int16).tobytes())
+
+
+def test_decode_keeps_rate(tmp_path):
+    file = tmp_path / "sound.wav"
+    expected = np.arange(16_000, dtype=np.int16)
+    write_wav(file, expected, rate=16_000)
+
+    signal, rate = decode_to_memory(str(file))
+
+    assert rate == 16_000
+    assert np.array_equal(signal, expected)
+
+    signal, rate = decode_to_memory(str(file), rate=8_000)
+
+    assert rate == 8_000
+    assert len(signal) == 8_000
+
+
+def test_analyze_empty_file(tmp_path):
+    file = tmp_path / "20231215_093653_tp00033.wav"
+    write_wav(file, np.array([]), rate=8_000)
+
+    result = analyze_file(str(file))
+
+    assert result.total_time == 0
+    assert result.bark_time == 0
+
+
+def test_analyze_files(tmp_path):
+    files = []
+    for minute in (3, 1, 4, 2):  # not sorted - results keep input order
+        file = tmp_path / f"20231215_09{minute:02d}00_tp00033.wav"
+        signal = np.full(minute * 800, 200)
+        signal[::2] = 0
+        write_wav(file, signal, rate=8_000)
+        files.append(str(file))
+
+    results = analyze_files(
+        files,
+        max_workers=1,  # in-flight window (2) smaller than the file count
+        cutoff=100,
+        undersample=10,
+        output_file="auto",
+    )
+
+    assert [result.timestamp.minute for result in results] == [3, 1, 4, 2]
+    assert [result.total_time for result in results] == [0.3, 0.1, 0.4, 0.2]
+    assert all(
+        np.isclose(result.bark_time, result.total_time / 2)
+        for result in results
+    )
+    for file in files:
+        assert Path(file).with_suffix(".png").is_file()
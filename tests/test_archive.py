@@ -1,7 +1,13 @@
+import shutil
+import subprocess
+import tarfile
 from argparse import Namespace
 from pathlib import Path
 
-from soundtrack_analyzer.archive import archive_dir
+import pytest
+
+from soundtrack_analyzer import archive
+from soundtrack_analyzer.archive import archive_dir, compress
 from soundtrack_analyzer.archive import main as archive_main
 
 
@@ -63,3 +69,64 @@ def test_archive_superdir_all(tmp_path):
         folder = root / str(name)
         assert not any(folder.glob("*.mp4"))
         assert (folder / "recordings.tgz").is_file()
+
+
+@pytest.fixture(params=["pigz", "tar", "tarfile"])
+def compression(request, monkeypatch):
+    """Select the compression path (pigz is used only when installed)"""
+    which = shutil.which
+
+    if request.param == "pigz":
+        if which("pigz") is None or not archive._gnu_tar():
+            pytest.skip("pigz or GNU tar not installed")
+    elif request.param == "tar":
+        if not archive._gnu_tar():
+            pytest.skip("GNU tar not installed")
+        monkeypatch.setattr(
+            shutil, "which", lambda cmd: None if cmd == "pigz" else which(cmd)
+        )
+    else:
+        monkeypatch.setattr(archive, "_gnu_tar", lambda: False)
+
+    return request.param
+
+
+def test_archive_content(tmp_path, compression):
+    root = create_tree(tmp_path)
+    folder = root / "1"
+    for name in ("file1", "file2", "file3"):
+        (folder / f"{name}.mp4").write_text(f"{name} content")
+
+    archive_dir(folder)
+
+    with tarfile.open(folder / "recordings.tgz") as handle:
+        members = sorted(handle.getnames())
+        contents = {
+            name: handle.extractfile(name).read().decode() for name in members
+        }
+
+    assert members == [
+        "recordings/file1.mp4",
+        "recordings/file2.mp4",
+        "recordings/file3.mp4",
+    ]
+    assert contents["recordings/file2.mp4"] == "file2 content"
+    assert sorted(path.name for path in folder.iterdir()) == [
+        "file1.jpg",
+        "file2.jpg",
+        "file3.jpg",
+        "recordings.tgz",
+        "summary.csv",
+    ]
+
+
+def test_failed_archive_keeps_existing(tmp_path, compression):
+    folder = create_tree(tmp_path) / "1"
+    existing = folder / "recordings.tgz"
+    existing.write_text("previous archive")
+
+    with pytest.raises((subprocess.CalledProcessError, FileNotFoundError)):
+        compress(folder, [folder / "missing.mp4"])
+
+    assert existing.read_text() == "previous archive"
+    assert not (folder / "recordings.tgz.part").exists()
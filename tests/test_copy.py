@@ -1,34 +1,43 @@
 from datetime import datetime
 
-from soundtrack_analyzer.batch_copy import exists, get_filelist
+from soundtrack_analyzer.batch_copy import (
+    get_filelist,
+    index_destination,
+    size_matches,
+)
 
 
-def test_exist_nofile(tmp_path):
-    source = tmp_path / "source.txt"
-    source.write_text("sample text")
+def test_index_nofile(tmp_path):
+    dest = tmp_path / "destination.txt"
+
+    assert not index_destination([dest])
+    assert not index_destination([tmp_path / "missing" / "destination.txt"])
+
 
+def test_index(tmp_path):
     dest = tmp_path / "destination.txt"
+    dest.write_text("sample text")
+    (tmp_path / "other.txt").write_text("other text")
 
-    assert exists(source, dest) is False
+    assert index_destination([dest]) == {dest: len("sample text")}
 
 
-def test_exist(tmp_path):
+def test_size_match(tmp_path):
     source = tmp_path / "source.txt"
     source.write_text("sample text")
 
     dest = tmp_path / "destination.txt"
-    dest.write_text("sample text")
 
-    assert exists(source, dest) is True
+    assert size_matches(source, dest, len("sample text")) is True
 
 
-def test_exist_size_diff(tmp_path):
+def test_size_diff(tmp_path):
     source = tmp_path / "source.txt"
     source.write_text("sample text")
 
     dest = tmp_path / "destination.txt"
 
-    assert exists(source, dest) is False
+    assert size_matches(source, dest, len("text")) is False
 
 
 def test_filename_skip(tmp_path):
@@ -50,3 +59,28 @@ def test_filename_skip(tmp_path):
 
     assert len(files) == 1
     assert files[0].name == valid_name
+
+
+def test_copied_skip(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir(exist_ok=True, parents=True)
+
+    dest = tmp_path / "dest" / "2023" / "12"
+    dest.mkdir(exist_ok=True, parents=True)
+
+    cutoff_date = datetime(year=2023, month=2, day=16)
+
+    copied_name = "20231215_093653_tp00033.mp4"
+    (root / copied_name).write_text("sample text")
+    (dest / copied_name).write_text("sample text")
+
+    missmatch_name = "20231215_094653_tp00034.mp4"
+    (root / missmatch_name).write_text("sample text")
+    (dest / missmatch_name).write_text("text")
+
+    new_name = "20231215_095653_tp00035.mp4"
+    (root / new_name).write_text("sample text")
+
+    files = get_filelist(root, tmp_path / "dest", cutoff_date)
+
+    assert sorted(file.name for file in files) == [missmatch_name, new_name]
@@ -0,0 +1,51 @@
+from datetime import datetime
+
+import pytest
+
+from soundtrack_analyzer import summarize
+from soundtrack_analyzer.utils import write_csv
+
+
+@pytest.fixture
+def plotted(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        summarize,
+        "plot_summary",
+        lambda df, output_dir, title: calls.append((df, output_dir, title)),
+    )
+    return calls
+
+
+def test_yearly_summary_with_empty_month(tmp_path, plotted):
+    year = tmp_path / "2023"
+    (year / "1").mkdir(parents=True)
+    (year / "2").mkdir()
+
+    write_csv([], year / "1" / "summary.csv")
+    write_csv(
+        [(datetime(2023, 2, 3, 10, 20, 30), 60, 15)],
+        year / "2" / "summary.csv",
+    )
+
+    summarize.get_summary(year)
+
+    ((df, output_dir, title),) = plotted
+    assert output_dir == year
+    assert title == "2023"
+    assert len(df) == 1
+    assert str(df.timestamp.dtype) == summarize.TIMESTAMP_DTYPE
+    assert str(df.total_time.dtype) == "float64"
+    assert str(df.bark_time.dtype) == "float64"
+    assert df.bark_time.iloc[0] == 15.0
+
+
+def test_empty_summaries_keep_dtypes(tmp_path):
+    write_csv([], tmp_path / "summary.csv")
+
+    df = summarize.read_summaries([tmp_path / "summary.csv"])
+
+    assert df.empty
+    assert str(df.timestamp.dtype) == summarize.TIMESTAMP_DTYPE
+    assert str(df.total_time.dtype) == "float64"
+    assert str(df.bark_time.dtype) == "float64"
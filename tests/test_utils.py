@@ -1,6 +1,15 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
 import pytest
 
-from soundtrack_analyzer.utils import extract_timestamp, to_datetime
+from soundtrack_analyzer.utils import (
+    extract_timestamp,
+    to_datetime,
+    to_datetime_arr,
+    write_csv,
+)
 
 
 @pytest.mark.parametrize(
@@ -15,6 +24,23 @@ def test_timestamp_extraction(value, expected):
     assert str(extract_timestamp(value)) == expected
 
 
+@pytest.mark.parametrize(
+    "value",
+    [
+        "xxxxxxxx_xxxxxx_tp00033.mp4",
+        "20231215-093653_tp00033.mp4",
+        "20231215_0936531_x.mp4",
+        "20231215_09365_tp00033.mp4",
+        "2023121_5093653_tp00033.mp4",
+        "20231315_093653_tp00033.mp4",
+        "summary.csv",
+    ],
+)
+def test_timestamp_extraction_invalid(value):
+    with pytest.raises(ValueError):
+        extract_timestamp(value)
+
+
 @pytest.mark.parametrize(
     "value,expected",
     [
@@ -25,3 +51,37 @@ def test_timestamp_extraction(value, expected):
 )
 def test_sec2datetime_conversion(value, expected):
     assert str(to_datetime(value)) == expected
+
+
+def test_sec2datetime_array_conversion():
+    values = np.array([53.0, 75.2, 5_630.0])
+    expected = [
+        "2000-01-01 00:00:53",
+        "2000-01-01 00:01:15.200000",
+        "2000-01-01 01:33:50",
+    ]
+
+    result = to_datetime_arr(values)
+
+    assert [str(item) for item in result] == expected
+
+
+def test_write_csv(tmp_path):
+    file = tmp_path / "summary.csv"
+    first = (datetime(2023, 7, 5, 7, 50, 56), 900.0, 30.5)
+    second = (datetime(2023, 7, 5, 8, 5, 56), 899.5, 0.0)
+
+    write_csv([first], file)
+    write_csv([second], file)  # appends
+    df = pd.read_csv(file, parse_dates=["timestamp"])
+
+    assert list(df.columns) == ["timestamp", "total_time", "bark_time"]
+    assert [tuple(row) for row in df.itertuples(index=False)] == [
+        first,
+        second,
+    ]
+
+    write_csv([second], file, overwrite=True)
+    df = pd.read_csv(file, parse_dates=["timestamp"])
+
+    assert [tuple(row) for row in df.itertuples(index=False)] == [second]